@@ -13,33 +13,83 @@ Usage:
 """
 
 import argparse
+import asyncio
+import mmap
+import multiprocessing
+import os
 import plistlib
 import re
 import subprocess
-from multiprocessing import Pool, cpu_count
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from multiprocessing import cpu_count
 from pathlib import Path
+from typing import Callable
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml-backed, much faster
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import hyperscan  # Optional: SIMD multi-pattern matching for heading detection
+except ImportError:
+    hyperscan = None
+
 # Directory configuration
 SCRIPT_DIR = Path(__file__).parent
 CONFIG_FILE = SCRIPT_DIR / "config_regex.yaml"
 
-# Global rules variable for multiprocessing workers
+# Finder tag extended attribute, and how many cleaned files are tagged per
+# batch (at most one `xattr -w` call each)
+FINDER_TAGS_ATTR = "com.apple.metadata:_kMDItemUserTags"
+XATTR_BATCH_SIZE = 200
+
+# Inputs at least this large are read through mmap instead of a buffered read
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+# Green tag in macOS Finder format (invariant, so encoded once at import)
+_GREEN_TAG_PLIST = plistlib.dumps(["Green\n2"])
+
+# Global rules variable for process-pool workers
 _GLOBAL_RULES = []
 
+# Start method for the regex worker processes. Fork on Linux: workers inherit
+# the compiled rules instead of re-importing this module and unpickling
+# (recompiling) every pattern. macOS keeps the default spawn, as fork is
+# unsafe there once system frameworks are loaded.
+_POOL_CONTEXT = multiprocessing.get_context("fork") if sys.platform == "linux" else None
+
+# Parsed config cache, keyed on (path, mtime_ns, size) of config_regex.yaml
+_RULES_CACHE = {}
+
 
 def load_regex_rules() -> list:
-    """Load regex rules from the YAML config file."""
+    """
+    Load regex rules from the YAML config file.
+    The parsed rules are cached until the file's mtime or size changes.
+    """
     if not CONFIG_FILE.exists():
         print(f"WARNING: Config file not found: {CONFIG_FILE}")
         print("Creating default config file...")
         create_default_config()
 
+    st = CONFIG_FILE.stat()
+    key = (str(CONFIG_FILE), st.st_mtime_ns, st.st_size)
+    if key in _RULES_CACHE:
+        return _RULES_CACHE[key]
+
     with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YamlLoader)
 
-    return config.get("rules", [])
+    rules = config.get("rules", [])
+    _RULES_CACHE.clear()
+    _RULES_CACHE[key] = rules
+    return rules
 
 
 def create_default_config():
@@ -59,183 +109,494 @@ def create_default_config():
     print(f"Created: {CONFIG_FILE}")
 
 
-def apply_rules(content: str, rules: list) -> str:
-    """Apply all regex rules to the content."""
+def compile_rules(rules: list) -> list:
+    """
+    Compile YAML rules into (kind, find, replacement, name) tuples.
+
+    kind is "literal" when 'find' has no regex metacharacters and the
+    replacement has no escapes or backreferences; those rules run through
+    str.replace. Everything else is "regex" with a compiled pattern.
+    Rules with an empty 'find' pattern are dropped; invalid patterns are
+    reported once here rather than failing silently on every file.
+    """
+    compiled = []
     for rule in rules:
         find_pattern = rule.get("find", "")
         replace_pattern = rule.get("replace", "")
+        name = rule.get("name", "Unnamed")
 
         if not find_pattern:
             continue
 
+        # Literal fast path: str.replace avoids the regex engine entirely
+        if re.escape(find_pattern) == find_pattern and "\\" not in replace_pattern:
+            compiled.append(("literal", find_pattern, replace_pattern, name))
+            continue
+
         try:
-            content = re.sub(find_pattern, replace_pattern, content)
-        except re.error:
-            pass
+            compiled.append(("regex", re.compile(find_pattern), replace_pattern, name))
+        except re.error as e:
+            print(f"WARNING: Skipping rule '{name}' (invalid pattern: {e})")
 
-    return content
+    return compiled
 
 
-def mark_medical_headings(content: str) -> str:
+# Regex syntax that can match a newline, or that anchors to the start/end of
+# the whole file: ^ and $ (including [^...]), control characters, escapes
+# other than \d \w \b \B \S and escaped punctuation, and (?...) groups other
+# than non-capturing, named and lookaround groups (e.g. inline (?s) flags).
+_CROSS_LINE_SYNTAX_RE = re.compile(r'[\^$\x00-\x1f]|\\[^dwbBS\W]|\(\?(?![:P=!<])')
+
+
+def split_line_rules(rules: list) -> tuple:
     """
-    Detect and mark medical document headings as Markdown headers.
-    Uses line-by-line processing with priority ordering.
+    Split compiled rules into (line_rules, file_rules).
 
-    Handles: Academic papers (IMRAD), clinical guidelines, patient education,
-    Q&A formats, and case reports.
+    line_rules is the longest leading run of rules that can never match
+    across a line break, so applying them line by line gives the same
+    result as applying them to the whole file. file_rules is everything
+    from the first rule that might span lines onwards, preserving order.
+    """
+    for i, (kind, find, replace_pattern, name) in enumerate(rules):
+        if kind == "literal":
+            spans_lines = '\n' in find
+        else:
+            spans_lines = _CROSS_LINE_SYNTAX_RE.search(find.pattern) is not None
+        if spans_lines:
+            return rules[:i], rules[i:]
+    return rules, []
+
+
+def apply_rules(content: str, rules: list) -> str:
     """
-    lines = content.split('\n')
-    new_lines = []
+    Apply compiled regex rules (from compile_rules) to the content.
+    Each rule is first probed for a match, which stops at the first hit,
+    so rules that do not occur in a file never pay for a full substitution.
+    """
+    for kind, find, replace_pattern, name in rules:
+        if kind == "literal":
+            if find in content:
+                content = content.replace(find, replace_pattern)
+            continue
 
-    # 1. IMRAD structure (standard journal format)
-    p_structure = re.compile(
-        r'^\s*(?:\d+\.|[IVX]+\.)?\s*'
-        r'(Abstract|Summary|Introduction|Background|Objectives?|Aims?|'
-        r'Methods?|Materials\s+and\s+Methods|Patients\s+and\s+Methods|'
-        r'Study\s+Design|Results?|Findings?|Discussion|Comments?|'
-        r'Conclusion.*|Future\s+Directions)\s*$',
-        re.IGNORECASE
-    )
+        if find.search(content) is None:
+            continue
 
-    # 2. Clinical & Causation headings (crucial for malpractice analysis)
-    p_clinical = re.compile(
-        r'^\s*(?:\d+\.|[IVX]+\.)?\s*'
-        r'(Epidemiology|Etiology|Pathophysiology|Pathogenesis|'
-        r'Clinical\s+Presentation|Diagnosis|Evaluation|Investigations|'
-        r'Management|Treatment|Therapy|Prognosis|Complications|'
-        r'Prevention|Recommendations?|Key\s+Points?)\s*$',
-        re.IGNORECASE
-    )
+        try:
+            content = find.sub(replace_pattern, content)
+        except re.error:
+            pass
+
+    return content
 
+
+# Medical heading patterns, compiled once at import.
+# Patterns are written in lowercase: ASCII lines are matched lowercased
+# against the flag-free HEADING_RE/META_RE, which skips the per-character
+# case folding of re.IGNORECASE. Non-ASCII lines use the IGNORECASE
+# variants so Unicode case rules (e.g. U+017F long s) still apply.
+# Named-section families, in the order they are fused into HEADING_RE.
+_HEADING_PATTERNS = [
+    # 1. IMRAD structure (standard journal format)
+    ("structure",
+     r'^\s*(?:\d+\.|[ivx]+\.)?\s*'
+     r'(abstract|summary|introduction|background|objectives?|aims?|'
+     r'methods?|materials\s+and\s+methods|patients\s+and\s+methods|'
+     r'study\s+design|results?|findings?|discussion|comments?|'
+     r'conclusion.*|future\s+directions)\s*$'),
+    # 2. Clinical & Causation headings (crucial for malpractice analysis)
+    ("clinical",
+     r'^\s*(?:\d+\.|[ivx]+\.)?\s*'
+     r'(epidemiology|etiology|pathophysiology|pathogenesis|'
+     r'clinical\s+presentation|diagnosis|evaluation|investigations|'
+     r'management|treatment|therapy|prognosis|complications|'
+     r'prevention|recommendations?|key\s+points?)\s*$'),
     # 3. Patient Education / MedlinePlus style
-    p_patient_ed = re.compile(
-        r'^\s*(Start\s+Here|Diagnosis\s+and\s+Tests?|Related\s+Issues|'
-        r'Genetics|Clinical\s+Trials?|Journal\s+Articles?|'
-        r'Find\s+an\s+Expert|Patient\s+Handouts?|Medical\s+Encyclopedia)\s*$',
-        re.IGNORECASE
-    )
+    ("patient_ed",
+     r'^\s*(start\s+here|diagnosis\s+and\s+tests?|related\s+issues|'
+     r'genetics|clinical\s+trials?|journal\s+articles?|'
+     r'find\s+an\s+expert|patient\s+handouts?|medical\s+encyclopedia)\s*$'),
+    # 4. Case reports
+    ("case",
+     r'^\s*(case\s+report[s]?|case\s+presentation|case\s+\d+(?:-\d+)?)\s*$'),
+    # 5. Q&A / Definition headers (e.g., "What are Fats?", "Types of fat")
+    ("qa",
+     r'^\s*(what\s+are\s+.+\??|what\s+is\s+.+\??|how\s+does\s+.+\??|'
+     r'types\s+of\s+.+|alternative\s+names?)\s*$'),
+]
+
+# 6. Back matter (meta-data to separate from clinical content)
+_META_PATTERN = (
+    r'^\s*(references|bibliography|literature\s+cited|'
+    r'abbreviations?|key\s*words?|'
+    r'acknowledgments?|disclosures?|conflicts?\s+of\s+interest|'
+    r'funding|financial\s+support|author\s+contributions)\s*$'
+)
+
+# Fused into one alternation so each line needs a single match call;
+# m.lastgroup names the family that matched.
+_FUSED_HEADING_PATTERN = "|".join(
+    f"(?P<{name}>{pattern})" for name, pattern in _HEADING_PATTERNS
+)
+HEADING_RE = re.compile(_FUSED_HEADING_PATTERN)
+META_RE = re.compile(_META_PATTERN)
+_HEADING_RE_CASELESS = re.compile(_FUSED_HEADING_PATTERN, re.IGNORECASE)
+_META_RE_CASELESS = re.compile(_META_PATTERN, re.IGNORECASE)
+
+# Exact keyword phrases (lowercase, single-spaced) of every fixed alternative
+# above, for dispatch by dictionary lookup. Must mirror _HEADING_PATTERNS and
+# _META_PATTERN: optional plurals are listed in both forms. Open-ended forms
+# (conclusion.*, what/how/types ..., case <number>) and numbered/Roman
+# prefixes are left to the regexes.
+_SECTION_KEYWORDS = dict.fromkeys((
+    # 1. IMRAD structure
+    "abstract", "summary", "introduction", "background",
+    "objective", "objectives", "aim", "aims", "method", "methods",
+    "materials and methods", "patients and methods", "study design",
+    "result", "results", "finding", "findings", "discussion",
+    "comment", "comments", "future directions",
+    # 2. Clinical & Causation
+    "epidemiology", "etiology", "pathophysiology", "pathogenesis",
+    "clinical presentation", "diagnosis", "evaluation", "investigations",
+    "management", "treatment", "therapy", "prognosis", "complications",
+    "prevention", "recommendation", "recommendations", "key point", "key points",
+    # 3. Patient Education
+    "start here", "diagnosis and test", "diagnosis and tests", "related issues",
+    "genetics", "clinical trial", "clinical trials", "journal article",
+    "journal articles", "find an expert", "patient handout", "patient handouts",
+    "medical encyclopedia",
+    # 4. Case reports
+    "case report", "case reports", "case presentation",
+    # 5. Q&A
+    "alternative name", "alternative names",
+), "heading")
+for _phrase in (
+    # 6. Back matter
+    "references", "bibliography", "literature cited",
+    "abbreviation", "abbreviations", "keyword", "keywords", "key word", "key words",
+    "acknowledgment", "acknowledgments", "disclosure", "disclosures",
+    "conflict of interest", "conflicts of interest",
+    "funding", "financial support", "author contributions",
+):
+    _SECTION_KEYWORDS.setdefault(_phrase, "meta")
+
+# First words of the open-ended alternatives, which need the regexes
+_OPEN_ENDED_FIRST_WORDS = frozenset(("what", "how", "types", "case"))
+
+# Numbered (1.) or Roman (iv.) section prefix, which also needs the regexes
+_NUMBER_PREFIX_RE = re.compile(r'(?:\d+|[ivx]+)\.')
+
+# Sentinel from _lookup_section_keyword: fall through to the regexes
+_NEEDS_REGEX = object()
+
+# 7. ALL CAPS heuristic (with noise filtering)
+CAPS_RE = re.compile(
+    r'^(?!.*\b(Copyright|DOI|ISSN|Vol\.|Page)\b)[A-Z][A-Z0-9\s\-\(\):]{3,80}$'
+)
+
+# Translation table deleting '.' and ' ' (used to spot numeric-only lines)
+_DOT_SPACE_STRIP = str.maketrans('', '', '. ')
+
+# Characters a stripped heading line can start with: numbering digits, any
+# capital (ALL CAPS), and the lowercase initials of every keyword above
+# (including Roman numerals and the Unicode case variants IGNORECASE accepts
+# for s, k and i). Lines starting with anything else (other than a non-ASCII
+# decimal digit, which \d also accepts) skip the regexes.
+_FIRST_CHARS = frozenset(
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "abcdefghijklmoprstvwx"
+    "\u017f\u212a\u0130\u0131"
+)
+
+
+def _build_hyperscan_db():
+    """
+    Compile the named-section and back-matter patterns into one Hyperscan
+    database (ids 0..N-1 are heading families, id N is back matter).
+    Returns None if hyperscan is not installed or rejects a pattern.
+    """
+    if hyperscan is None:
+        return None
 
-    # 4. Q&A / Definition headers (e.g., "What are Fats?", "Types of fat")
-    p_qa = re.compile(
-        r'^\s*(What\s+are\s+.+\??|What\s+is\s+.+\??|How\s+does\s+.+\??|'
-        r'Types\s+of\s+.+|Alternative\s+Names?)\s*$',
-        re.IGNORECASE
-    )
+    patterns = [pattern for _, pattern in _HEADING_PATTERNS] + [_META_PATTERN]
+    flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH |
+             hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP)
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[p.encode("utf-8") for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[flags] * len(patterns),
+        )
+        return db
+    except Exception:
+        return None
 
-    # 5. Case reports
-    p_case = re.compile(
-        r'^\s*(Case\s+Report[s]?|Case\s+Presentation|Case\s+\d+(?:-\d+)?)\s*$',
-        re.IGNORECASE
-    )
 
-    # 6. Back matter (meta-data to separate from clinical content)
-    p_meta = re.compile(
-        r'^\s*(References|Bibliography|Literature\s+Cited|'
-        r'Abbreviations?|Key\s*words?|'
-        r'Acknowledgments?|Disclosures?|Conflicts?\s+of\s+Interest|'
-        r'Funding|Financial\s+Support|Author\s+Contributions)\s*$',
-        re.IGNORECASE
-    )
+_HYPERSCAN_DB = _build_hyperscan_db()
 
-    # 7. ALL CAPS heuristic (with noise filtering)
-    p_caps = re.compile(
-        r'^(?!.*\b(Copyright|DOI|ISSN|Vol\.|Page)\b)[A-Z][A-Z0-9\s\-\(\):]{3,80}$'
-    )
 
-    for line in lines:
-        clean = line.strip()
-        if not clean:
-            new_lines.append(line)
-            continue
+def _on_hyperscan_match(pattern_id, start, end, flags, matched_ids):
+    """Hyperscan callback: record which pattern ids matched the line."""
+    matched_ids.append(pattern_id)
 
-        # Skip lines that are already headers
-        if clean.startswith('#'):
-            new_lines.append(line)
-            continue
 
-        # Priority 1: High-confidence named sections → ## heading
-        if (p_structure.match(clean) or p_clinical.match(clean) or
-            p_patient_ed.match(clean) or p_case.match(clean) or p_qa.match(clean)):
-            new_lines.append(f"\n## {clean}\n")
+def _lookup_section_keyword(probe: str):
+    """
+    Classify a lowercased ASCII line by its words, without a regex.
 
-        # Priority 2: Back matter → --- separator + ### heading
-        elif p_meta.match(clean):
-            new_lines.append(f"\n---\n### {clean}\n")
+    Returns "heading" or "meta" for an exact keyword phrase, None when no
+    heading pattern can match (the first word starts none of them), or
+    _NEEDS_REGEX for numbered/Roman-prefixed and open-ended forms.
+    """
+    if _NUMBER_PREFIX_RE.match(probe):
+        return _NEEDS_REGEX
+
+    words = probe.split()
+    section = _SECTION_KEYWORDS.get(' '.join(words))
+    if section is not None:
+        return section
+
+    first = words[0]
+    if first in _OPEN_ENDED_FIRST_WORDS or first.startswith('conclusion'):
+        return _NEEDS_REGEX
+    return None
 
-        # Priority 3: ALL CAPS fallback (with sentence filtering)
-        elif p_caps.match(clean) and not clean.replace('.', '').replace(' ', '').isdigit():
-            # Sanity check: headers are typically short and don't end with period
-            if len(clean.split()) < 12 and not clean.endswith('.'):
-                new_lines.append(f"\n## {clean}\n")
-            else:
-                new_lines.append(line)
 
+def _classify_section(clean: str):
+    """
+    Return "heading" for a named section, "meta" for back matter, or None.
+    ASCII lines are resolved by keyword lookup where possible; the rest go
+    to the Hyperscan database when available, otherwise Python re.
+    """
+    if clean.isascii():
+        probe = clean.lower()
+        section = _lookup_section_keyword(probe)
+        if section is not _NEEDS_REGEX:
+            return section
+        heading_re, meta_re = HEADING_RE, META_RE
+    else:
+        probe = clean
+        heading_re, meta_re = _HEADING_RE_CASELESS, _META_RE_CASELESS
+
+    if _HYPERSCAN_DB is not None:
+        matched_ids = []
+        _HYPERSCAN_DB.scan(clean.encode("utf-8"),
+                           match_event_handler=_on_hyperscan_match,
+                           context=matched_ids)
+        if not matched_ids:
+            return None
+        return "heading" if min(matched_ids) < len(_HEADING_PATTERNS) else "meta"
+
+    if heading_re.match(probe):
+        return "heading"
+    if meta_re.match(probe):
+        return "meta"
+    return None
+
+
+def _iter_lines(content: str):
+    """
+    Yield the lines of content with their '\\n' terminators kept.
+    Unlike str.splitlines(), only '\\n' ends a line.
+    """
+    start = 0
+    while True:
+        end = content.find('\n', start)
+        if end == -1:
+            yield content[start:]
+            return
+        yield content[start:end + 1]
+        start = end + 1
+
+
+def _mark_heading(line: str) -> str:
+    """Return the Markdown for one line (without its '\\n'), marking headings."""
+    clean = line.strip()
+    if not clean:
+        return line
+
+    # Skip lines that are already headers, and body text that cannot
+    # start any heading pattern
+    if clean[0] not in _FIRST_CHARS and not clean[0].isdecimal():
+        return line
+
+    section = _classify_section(clean)
+
+    # Priority 1: High-confidence named sections → ## heading
+    if section == "heading":
+        return f"\n## {clean}\n"
+
+    # Priority 2: Back matter → --- separator + ### heading
+    if section == "meta":
+        return f"\n---\n### {clean}\n"
+
+    # Priority 3: ALL CAPS fallback (with sentence filtering)
+    if clean.isupper() and CAPS_RE.match(clean) and not clean.translate(_DOT_SPACE_STRIP).isdigit():
+        # Sanity check: headers are typically short and don't end with period
+        if len(clean.split()) < 12 and not clean.endswith('.'):
+            return f"\n## {clean}\n"
+
+    return line
+
+
+def _mark_headings_iter(content: str, line_rules: list):
+    """Yield output fragments for mark_medical_headings, one per input line."""
+    for line in _iter_lines(content):
+        if line.endswith('\n'):
+            fragment, newline = _mark_heading(line[:-1]), '\n'
         else:
-            new_lines.append(line)
+            fragment, newline = _mark_heading(line), ''
 
-    return '\n'.join(new_lines)
+        if line_rules:
+            fragment = apply_rules(fragment, line_rules)
+        yield fragment + newline
 
 
-def set_finder_tag_green(file_path: Path):
-    """Set a green Finder tag on a file using xattr."""
-    try:
-        # Green tag in macOS Finder format
-        tag_data = plistlib.dumps(["Green\n2"])
-        subprocess.run(
-            ["xattr", "-w", "com.apple.metadata:_kMDItemUserTags", tag_data, str(file_path)],
-            capture_output=True,
-            check=True
-        )
-    except Exception:
-        pass  # Silent fail for tags (non-critical)
+def mark_medical_headings(content: str, line_rules: list = ()) -> str:
+    """
+    Detect and mark medical document headings as Markdown headers.
+    Uses line-by-line processing with priority ordering, streaming the
+    output fragments straight into the final string.
 
+    line_rules (see split_line_rules) are applied to each line in the same
+    pass, right after heading detection, saving a second scan of the file.
 
-def clean_markdown(input_path: Path, output_path: Path, rules: list) -> bool:
+    Handles: Academic papers (IMRAD), clinical guidelines, patient education,
+    Q&A formats, and case reports.
     """
-    Apply medical heading detection and regex rules to a Markdown file.
-    Returns True on success, False on failure.
+    return ''.join(_mark_headings_iter(content, line_rules))
+
+
+def set_finder_tags_green(file_paths: list):
     """
-    try:
-        with open(input_path, "r", encoding="utf-8") as f:
-            content = f.read()
+    Set a green Finder tag on files.
+    Uses os.setxattr where the platform provides it (no subprocess); any
+    files left over are tagged with one `xattr -w` call per batch.
+    """
+    setxattr = getattr(os, "setxattr", None)
+
+    pending = []
+    for file_path in file_paths:
+        if setxattr is not None:
+            try:
+                setxattr(str(file_path), FINDER_TAGS_ATTR, _GREEN_TAG_PLIST)
+                continue
+            except OSError:
+                pass
+        pending.append(str(file_path))
+
+    for i in range(0, len(pending), XATTR_BATCH_SIZE):
+        try:
+            subprocess.run(
+                ["xattr", "-w", FINDER_TAGS_ATTR, _GREEN_TAG_PLIST, *pending[i:i + XATTR_BATCH_SIZE]],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True
+            )
+        except Exception:
+            pass  # Silent fail for tags (non-critical)
+
+
+def read_markdown(input_path: Path) -> str:
+    """
+    Read a Markdown file as text, translating newlines like read_text().
+    Files of MMAP_THRESHOLD_BYTES or more are decoded straight from a
+    read-only memory map, skipping the intermediate bytes buffer.
+    """
+    if input_path.stat().st_size < MMAP_THRESHOLD_BYTES:
+        return input_path.read_text(encoding="utf-8")
+
+    with open(input_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = str(mm, "utf-8")
+
+    # Universal newlines, as text-mode reads would do
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
 
-        # Apply medical heading detection first
-        content = mark_medical_headings(content)
 
-        # Then apply YAML regex rules (dates, etc.)
-        cleaned_content = apply_rules(content, rules)
+def transform_markdown(content: str, rules: list) -> str:
+    """Apply medical heading detection and compiled regex rules to Markdown text."""
+    # Apply medical heading detection first, fused with the YAML rules
+    # (dates, etc.) that are safe to run line by line
+    line_rules, file_rules = split_line_rules(rules)
+    content = mark_medical_headings(content, line_rules)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(cleaned_content)
+    # Then apply the remaining YAML rules to the whole file
+    return apply_rules(content, file_rules)
 
-        # Apply green Finder tag
-        set_finder_tag_green(output_path)
 
+def clean_markdown(input_path: Path, output_path: Path, rules: list) -> bool:
+    """
+    Apply medical heading detection and compiled regex rules to a Markdown file.
+    Returns True on success, False on failure.
+    """
+    try:
+        content = read_markdown(input_path)
+        output_path.write_text(transform_markdown(content, rules), encoding="utf-8")
         return True
     except Exception:
         return False
 
 
-def _clean_single_file(args: tuple) -> tuple:
-    """
-    Worker function for parallel processing.
-    Args: (input_path, output_path) tuple
-    Returns: (status, filename) tuple where status is 'success', 'skipped', or 'failed'
+def _transform_worker(content: str) -> str:
+    """Process-pool task: transform content with the worker's shared rules."""
+    return transform_markdown(content, _GLOBAL_RULES)
+
+
+async def _clean_files_async(work_items: list, rules: list, workers: int,
+                             on_success: Callable[[Path], None] = None) -> list:
     """
-    input_path, output_path = args
+    Clean files with I/O and regex work overlapped.
 
-    # Skip if output already exists
-    if output_path.exists():
-        return ('skipped', input_path.name)
+    Reads and writes run on a thread pool while the regex work runs on a
+    process pool, so disk latency hides behind compute. 2 x workers
+    coroutines pull files from a shared iterator, so at most that many files
+    (and tasks) are in flight to bound memory. Each file is reported as soon
+    as it finishes, and on_success (if given) is called with each output path.
 
-    # Clean
-    if clean_markdown(input_path, output_path, _GLOBAL_RULES):
-        return ('success', input_path.name)
-    return ('failed', input_path.name)
+    Returns: list of (status, filename) tuples ('success' or 'failed'), in completion order
+    """
+    # No more worker processes than files (fork starts them all up front)
+    workers = max(1, min(workers, len(work_items)))
+    loop = asyncio.get_running_loop()
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT,
+                             initializer=_init_worker, initargs=(rules,)) as cpu_pool:
+        if _POOL_CONTEXT is not None:
+            # A forking pool starts all its workers on the first task; run a
+            # no-op now so they fork before any I/O thread exists
+            await loop.run_in_executor(cpu_pool, int)
+        with ThreadPoolExecutor(max_workers=workers) as io_pool:
+
+            async def clean_next(pending):
+                """Worker: clean files from the shared iterator until it is exhausted."""
+                for input_path, output_path in pending:
+                    try:
+                        content = await loop.run_in_executor(io_pool, read_markdown, input_path)
+                        cleaned = await loop.run_in_executor(cpu_pool, _transform_worker, content)
+                        await loop.run_in_executor(
+                            io_pool, partial(output_path.write_text, cleaned, encoding="utf-8"))
+                    except Exception:
+                        print(f"  ✗ {input_path.name}")
+                        results.append(('failed', input_path.name))
+                        continue
+                    print(f"  ✓ {input_path.name}")
+                    results.append(('success', input_path.name))
+                    if on_success:
+                        on_success(output_path)
+
+            pending = iter(work_items)
+            await asyncio.gather(*(clean_next(pending) for _ in range(2 * workers)))
+    return results
 
 
 def _init_worker(rules: list):
-    """Initialize worker with shared rules."""
+    """Initialize worker with shared (already compiled) rules."""
     global _GLOBAL_RULES
     _GLOBAL_RULES = rules
 
@@ -268,6 +629,7 @@ def run(input_dir: Path, workers: int = None) -> dict:
     print(f"\nLoaded {len(rules)} regex rule(s) from config.")
     for rule in rules:
         print(f"  - {rule.get('name', 'Unnamed')}: {rule.get('description', '')}")
+    rules = compile_rules(rules)
 
     # Check if input directory exists
     if not raw_md_dir.exists():
@@ -275,8 +637,12 @@ def run(input_dir: Path, workers: int = None) -> dict:
         print("Run Stage 2 first.")
         return {'converted': 0, 'skipped': 0, 'failed': 0}
 
-    # Get list of Markdown files
-    md_files = sorted(raw_md_dir.glob("*.md"))
+    # Get list of Markdown files (one directory read, no stat per file;
+    # hidden files such as macOS "._" AppleDouble copies are skipped)
+    with os.scandir(raw_md_dir) as entries:
+        md_files = sorted(Path(entry.path) for entry in entries
+                          if entry.name.endswith(".md") and not entry.name.startswith(".")
+                          and entry.is_file())
 
     if not md_files:
         print(f"\nNo Markdown files found in {raw_md_dir}")
@@ -295,40 +661,71 @@ def run(input_dir: Path, workers: int = None) -> dict:
         for md_path in md_files
     ]
 
+    # Snapshot existing outputs once (one directory read instead of a stat per file)
+    with os.scandir(output_dir) as entries:
+        existing = {entry.name for entry in entries}
+
+    # New outputs are tagged in batches as they are written (one syscall per
+    # file, no per-file fork), so an interrupted run leaves no finished file
+    # untagged; reruns skip existing outputs and would never tag it
+    untagged = []
+    tagged_count = 0
+
+    def tag_green(output_path: Path = None):
+        """Queue output_path for tagging; tag a full batch, or whatever is queued if no path is given."""
+        nonlocal tagged_count
+        if output_path is not None:
+            untagged.append(output_path)
+            if len(untagged) < XATTR_BATCH_SIZE:
+                return
+        if untagged:
+            set_finder_tags_green(untagged)
+            tagged_count += len(untagged)
+            untagged.clear()
+
     # Process files
-    if workers == 1:
-        # Sequential processing (preserves detailed output)
-        results = []
-        for i, (md_path, output_path) in enumerate(work_items, 1):
-            print(f"[{i}/{len(work_items)}] {md_path.name}")
-            if output_path.exists():
-                print(f"  Skipping... (output already exists)")
-                results.append(('skipped', md_path.name))
-            else:
-                print(f"  Applying regex rules + green tag...")
-                if clean_markdown(md_path, output_path, rules):
-                    print(f"  Success: {output_path.name}")
-                    results.append(('success', md_path.name))
+    try:
+        if workers == 1:
+            # Sequential processing (preserves detailed output)
+            results = []
+            for i, (md_path, output_path) in enumerate(work_items, 1):
+                print(f"[{i}/{len(work_items)}] {md_path.name}")
+                if output_path.name in existing:
+                    print(f"  Skipping... (output already exists)")
+                    results.append(('skipped', md_path.name))
                 else:
-                    print(f"  Failed: {md_path.name}")
-                    results.append(('failed', md_path.name))
-    else:
-        # Parallel processing
-        print("Processing files in parallel...")
-        with Pool(workers, initializer=_init_worker, initargs=(rules,)) as pool:
-            results = pool.map(_clean_single_file, work_items)
-
-        # Print summary of results
-        for status, filename in results:
-            if status == 'success':
-                print(f"  ✓ {filename}")
-            elif status == 'failed':
-                print(f"  ✗ {filename}")
-
-    # Count results
-    success_count = sum(1 for r in results if r[0] == 'success')
-    skip_count = sum(1 for r in results if r[0] == 'skipped')
-    fail_count = sum(1 for r in results if r[0] == 'failed')
+                    print(f"  Applying regex rules...")
+                    if clean_markdown(md_path, output_path, rules):
+                        print(f"  Success: {output_path.name}")
+                        results.append(('success', md_path.name))
+                        tag_green(output_path)
+                    else:
+                        print(f"  Failed: {md_path.name}")
+                        results.append(('failed', md_path.name))
+        else:
+            # Parallel processing (I/O on threads, regex work on processes);
+            # existing outputs are skipped here and never dispatched
+            print("Processing files in parallel...")
+            results = [('skipped', md_path.name) for md_path, output_path in work_items
+                       if output_path.name in existing]
+            to_do = [(md_path, output_path) for md_path, output_path in work_items
+                     if output_path.name not in existing]
+            # Largest files first, so a big file does not start last and leave one
+            # worker running alone at the end
+            to_do.sort(key=lambda item: item[0].stat().st_size, reverse=True)
+            results += asyncio.run(_clean_files_async(to_do, rules, workers,
+                                                      on_success=tag_green))
+    finally:
+        tag_green()  # The last, partial batch (also on Ctrl-C or an error)
+
+    if tagged_count:
+        print(f"\nApplied green Finder tags to {tagged_count} file(s).")
+
+    # Count results (one pass)
+    counts = Counter(status for status, _ in results)
+    success_count = counts['success']
+    skip_count = counts['skipped']
+    fail_count = counts['failed']
 
     # Summary
     print("\n" + "-" * 40)
@@ -358,7 +755,7 @@ def main():
 
     if not args.input.is_dir():
         print(f"Error: {args.input} is not a valid directory")
-        return
+        sys.exit(1)
 
     run(args.input, workers=args.workers)
 
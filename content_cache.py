@@ -0,0 +1,110 @@
+"""
+Content-Hash Cache
+Shared by Stage 1 and Stage 2 to skip reconverting inputs seen before.
+
+Outputs are stored as _cache/<stage>/<sha256 of input><suffix>, so a file
+that is re-dropped unchanged or under a new name is restored with a copy
+instead of another Acrobat/Pandoc run. A stage whose output also depends on
+the converter (its version and options) passes them as a variant, which is
+mixed into the key. A manifest.json per stage maps each key to the source
+filename it came from (for debugging only).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+# Directory configuration
+SCRIPT_DIR = Path(__file__).parent
+CACHE_DIR = SCRIPT_DIR / "_cache"
+
+
+# Read size for hashing on Pythons without hashlib.file_digest (< 3.11)
+DIGEST_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file, read in streaming chunks."""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        while chunk := f.read(DIGEST_CHUNK_BYTES):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class ContentCache:
+    """
+    Digest-keyed output cache for one pipeline stage.
+
+    Args:
+        stage: Cache subfolder name (e.g. "stage1_docx")
+        suffix: Extension of the cached output (e.g. ".docx")
+        variant: Converter version/options; entries from another variant never match
+    """
+
+    def __init__(self, stage: str, suffix: str, variant: str = ""):
+        self.dir = CACHE_DIR / stage
+        self.suffix = suffix
+        self.variant = variant
+        self.manifest_path = self.dir / "manifest.json"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self._dirty = False
+
+    def _key(self, digest: str) -> str:
+        if not self.variant:
+            return digest
+        return hashlib.sha256(f"{digest}\0{self.variant}".encode("utf-8")).hexdigest()
+
+    def _entry(self, digest: str) -> Path:
+        return self.dir / f"{self._key(digest)}{self.suffix}"
+
+    def restore(self, digest: str, output_path: Path) -> bool:
+        """Copy the cached output for digest to output_path. Returns True on a hit."""
+        entry = self._entry(digest)
+        if not entry.is_file():
+            return False
+        tmp = output_path.with_name(f".{output_path.name}.tmp")
+        try:
+            shutil.copyfile(entry, tmp)
+            os.replace(tmp, output_path)  # Atomic: never leaves a half-written output
+        except OSError:
+            return False
+        return True
+
+    def store(self, digest: str, output_path: Path, source_name: str):
+        """Add a freshly converted output to the cache (best effort)."""
+        entry = self._entry(digest)
+        tmp = entry.with_name(f".{entry.name}.tmp")
+        try:
+            shutil.copyfile(output_path, tmp)
+            os.replace(tmp, entry)  # Atomic: never leaves a half-written entry
+        except OSError:
+            return
+        self.manifest[self._key(digest)] = source_name
+        self._dirty = True
+
+    def save(self):
+        """
+        Write the manifest if entries were added this run. Entries already on
+        disk are kept, so caches of several variants can share one stage folder.
+        """
+        if not self._dirty:
+            return
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.update(self.manifest)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        self._dirty = False
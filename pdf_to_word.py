@@ -6,66 +6,465 @@ Converts PDFs to Word (.docx) using Adobe Acrobat's AppleScript interface.
 Uses external acrobat_export.scpt which invokes Acrobat's JavaScript saveAs()
 for synchronous (blocking) file writes.
 
+When pypdf and LibreOffice are installed, PDFs that already have a text layer
+are converted by headless soffice workers in parallel, keeping the single
+Acrobat worker for scanned PDFs (and as the fallback if soffice fails).
+
 Usage:
     python3 pdf_to_word.py --input /path/to/pdf/folder
 """
 
 import argparse
+import heapq
+import json
+import os
+import random
+import shutil
+import statistics
 import subprocess
+import sys
+import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import timedelta
+from functools import lru_cache
+from multiprocessing import cpu_count
 from pathlib import Path
+from queue import Empty, Queue
+from typing import Callable
+
+from content_cache import ContentCache, file_digest
+
+try:
+    from pypdf import PdfReader  # Optional: text-layer probe for the soffice lane
+except ImportError:
+    PdfReader = None
 
 # Directory configuration
 SCRIPT_DIR = Path(__file__).parent
 APPLESCRIPT_FILE = SCRIPT_DIR / "acrobat_export.scpt"
+COMPILED_SCRIPT_FILE = SCRIPT_DIR / "acrobat_export.compiled.scpt"  # Generated by osacompile
 
-# Delay between files to prevent Acrobat from freezing
+# Minimum interval between the starts of successive conversions, to prevent
+# Acrobat from freezing (enforced between files by acrobat_export.scpt and
+# between batches by run)
 DELAY_SECONDS = 5
 
-# Abort after this many consecutive failures (indicates systemic issue)
+# Attempts per file; retry n waits a random 0..RETRY_BASE_SECONDS * 2**(n-1)
+# seconds (full jitter, ceilings 10s, 20s, 40s, capped at RETRY_MAX_SECONDS).
+# Acrobat is force-killed before the final attempt.
+MAX_ATTEMPTS = 4
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 60
+
+# After a force-kill: wait up to KILL_WAIT_SECONDS for the process to exit,
+# then KILL_SETTLE_SECONDS more
+KILL_WAIT_SECONDS = 5
+KILL_SETTLE_SECONDS = 0.5
+
+# Acrobat is launched once before the first batch so its cold start is not
+# charged to the first file's timeout; wait up to this long for the process
+LAUNCH_WAIT_SECONDS = 30
+
+# Circuit breaker: pause Acrobat after this many consecutive failures
+# (indicates systemic issue), probe with one file after the recovery window
+# (doubled after each failed probe), and abort after MAX_FAILED_PROBES
 MAX_CONSECUTIVE_FAILURES = 5
+RECOVERY_SECONDS = 30
+MAX_RECOVERY_SECONDS = 240
+MAX_FAILED_PROBES = 3
+
+# Files converted per osascript invocation, and the timeout per file.
+# Once ADAPTIVE_MIN_SAMPLES conversions have succeeded, the per-file timeout
+# becomes 2x the p95 of the last ADAPTIVE_WINDOW durations (at least
+# MIN_TIMEOUT_SECONDS), so a hung Acrobat is detected sooner.
+BATCH_SIZE = 10
+CONVERSION_TIMEOUT_SECONDS = 180
+MIN_TIMEOUT_SECONDS = 60
+ADAPTIVE_WINDOW = 50
+ADAPTIVE_MIN_SAMPLES = 10
+
+# Per-folder record of finished files (_stage1_docx/_state.json), saved every
+# STATE_SAVE_EVERY updates: lets a rerun reuse digests of unchanged PDFs and
+# notice PDFs that changed since their .docx was written
+STATE_FILE_NAME = "_state.json"
+STATE_SAVE_EVERY = 10
+
+# LibreOffice lane for text PDFs: worker count, and the minimum number of
+# characters on page 1 for a PDF to count as text-based (not scanned)
+SOFFICE_WORKERS = cpu_count()
+TEXT_PDF_MIN_CHARS = 100
+MAC_SOFFICE = "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Per-file retry settings for a conversion stage.
+
+    Attempt n (1-based) that fails is retried after delay(n) seconds:
+    exponential from `base`, capped at `cap`, with full jitter so files that
+    fail together do not all retry together. `before_final_attempt` (if set)
+    runs before a file's last attempt.
+    """
+
+    max_attempts: int
+    base: float
+    cap: float
+    before_final_attempt: Callable[[], None] = None
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+
+    def is_final(self, attempt: int) -> bool:
+        return attempt >= self.max_attempts
+
+
+class CircuitBreaker:
+    """
+    CLOSED -> OPEN -> HALF_OPEN state machine guarding the Acrobat worker.
+
+    CLOSED: conversions run normally; `threshold` consecutive file failures
+    open the circuit. OPEN: no new Acrobat work is dispatched until
+    `recovery_s` has elapsed. HALF_OPEN: a single probe file is admitted;
+    success closes the circuit, failure reopens it with the recovery window
+    doubled (up to `max_recovery_s`).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, recovery_s: float, max_recovery_s: float):
+        self.threshold = threshold
+        self.initial_recovery_s = recovery_s
+        self.max_recovery_s = max_recovery_s
+        self.state = self.CLOSED
+        self.failures = 0  # Consecutive failures while CLOSED
+        self.opened_at = 0.0
+        self.recovery_s = recovery_s
+        self.half_open_probes = 0  # Probes in flight (at most 1)
+        self.failed_probes = 0  # Consecutive failed probes
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def seconds_until_half_open(self) -> float:
+        return max(0.0, self.opened_at + self.recovery_s - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """True if Acrobat may take new work now (moves OPEN -> HALF_OPEN when due)."""
+        if self.state == self.OPEN and self.seconds_until_half_open() == 0:
+            self.state = self.HALF_OPEN
+            self.half_open_probes = 0
+        if self.state == self.HALF_OPEN:
+            return self.half_open_probes == 0
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.recovery_s = self.initial_recovery_s
+        self.half_open_probes = 0
+        self.failed_probes = 0
+
+    def record_failure(self, probe: bool = False) -> bool:
+        """Record a failure. Returns True if this (re)opened the circuit."""
+        if probe:
+            self.half_open_probes = 0
+            self.failed_probes += 1
+            self.recovery_s = min(self.max_recovery_s, self.recovery_s * 2)
+            self._open()
+            return True
+        self.failures += 1
+        if self.state == self.CLOSED and self.failures >= self.threshold:
+            self._open()
+            return True
+        return False
+
+
+def acrobat_running() -> bool:
+    """Return True if an Adobe Acrobat process exists (None if pgrep is unavailable)."""
+    try:
+        return subprocess.run(
+            ["pgrep", "-f", "Adobe Acrobat"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ).returncode == 0
+    except OSError:
+        return None
 
 
 def force_kill_acrobat():
     """Force-kill Adobe Acrobat (handles modal dialog states like JS debugger)."""
     print("  >> Force-killing Adobe Acrobat...")
-    subprocess.run(["pkill", "-9", "-f", "Adobe Acrobat"], capture_output=True)
-    time.sleep(5)
+    subprocess.run(["pkill", "-9", "-f", "Adobe Acrobat"],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Poll until the process is gone instead of always sleeping the full window
+    # (without pgrep, fall back to waiting out the window)
+    deadline = time.monotonic() + KILL_WAIT_SECONDS
+    while time.monotonic() < deadline and acrobat_running() is not False:
+        time.sleep(0.1)
+    time.sleep(KILL_SETTLE_SECONDS)  # Let Acrobat's on-disk cleanup finish
     print("  >> Acrobat terminated.")
 
 
-def convert_pdf_to_word(pdf_path: Path, output_path: Path) -> bool:
+def warm_acrobat():
+    """Launch Adobe Acrobat in the background and wait until its process is up."""
+    if acrobat_running():
+        return
+    print("  >> Launching Adobe Acrobat...")
+    try:
+        subprocess.run(["open", "-g", "-a", "Adobe Acrobat"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       timeout=LAUNCH_WAIT_SECONDS, check=True)
+    except subprocess.CalledProcessError:
+        print("  WARNING: Could not launch Adobe Acrobat; is it installed?")
+        return
+    except (OSError, subprocess.TimeoutExpired):
+        return  # The first conversion launches it instead
+    deadline = time.monotonic() + LAUNCH_WAIT_SECONDS
+    while time.monotonic() < deadline and acrobat_running() is False:
+        time.sleep(0.2)
+
+
+# Acrobat is force-killed before a file's final attempt, in case it is
+# stuck in a modal state
+ACROBAT_RETRY_POLICY = RetryPolicy(
+    max_attempts=MAX_ATTEMPTS,
+    base=RETRY_BASE_SECONDS,
+    cap=RETRY_MAX_SECONDS,
+    before_final_attempt=force_kill_acrobat
+)
+
+
+@lru_cache(maxsize=None)
+def compiled_script() -> Path:
     """
-    Convert a PDF to Word using Adobe Acrobat via external AppleScript.
-    Uses JavaScript saveAs() for synchronous saving.
-    Returns True on success, False on failure.
+    Compile acrobat_export.scpt with osacompile (once per process, and only
+    when the compiled copy is missing or older than the source), so osascript
+    does not re-parse the script on every call.
+    Returns the compiled script, or the plain-text source if compiling fails.
     """
     try:
+        if (COMPILED_SCRIPT_FILE.exists() and
+                COMPILED_SCRIPT_FILE.stat().st_mtime >= APPLESCRIPT_FILE.stat().st_mtime):
+            return COMPILED_SCRIPT_FILE
         result = subprocess.run(
-            ["osascript", str(APPLESCRIPT_FILE), str(pdf_path), str(output_path)],
-            capture_output=True,
-            text=True,
-            timeout=180
+            ["osacompile", "-o", str(COMPILED_SCRIPT_FILE), str(APPLESCRIPT_FILE)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=60
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return APPLESCRIPT_FILE
+    return COMPILED_SCRIPT_FILE if result.returncode == 0 else APPLESCRIPT_FILE
+
+
+def convert_pdfs_to_word(pairs: list, timeout_s: float = CONVERSION_TIMEOUT_SECONDS) -> dict:
+    """
+    Convert a batch of PDFs to Word in a single osascript session.
+
+    The AppleScript converts each (pdf, output) pair in turn and logs one
+    status line per file as it finishes, so one fork/exec and one Apple Event
+    session are shared by the whole batch. The timeout restarts with every
+    status line: a hung file is caught after timeout_s, and files finished
+    before it keep their result.
+
+    Args:
+        pairs: List of (pdf_path, output_path) tuples
+        timeout_s: Timeout per file
+
+    Returns:
+        dict mapping each output_path to True on success, False on failure
+    """
+    results = {output_path: False for _, output_path in pairs}
+    try:
+        process = subprocess.Popen(
+            ["osascript", str(compiled_script()), str(DELAY_SECONDS),
+             *(str(path) for pair in pairs for path in pair)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
         )
-        if result.returncode != 0:
-            print(f"  ERROR: {result.stderr.strip()}")
-            return False
-        return True
-    except subprocess.TimeoutExpired:
-        print("  ERROR: Conversion timed out (180s)")
-        return False
     except Exception as e:
         print(f"  ERROR: {e}")
+        return results
+
+    # Status lines arrive on stderr: OK<tab>output_path  or
+    # FAIL<tab>output_path<tab>message. Anything else is an osascript error.
+    lines = Queue()
+
+    def read_lines():
+        for line in process.stderr:
+            lines.put(line.rstrip("\n"))
+        lines.put(None)
+
+    threading.Thread(target=read_lines, daemon=True).start()
+
+    by_name = {str(output_path): output_path for _, output_path in pairs}
+    reported = set()
+    errors = []
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            line = lines.get(timeout=max(0, deadline - time.monotonic()))
+        except Empty:
+            pending = next(output_path for _, output_path in pairs
+                           if output_path not in reported)
+            print(f"  ERROR: {pending.name}: conversion timed out ({timeout_s:.0f}s)")
+            process.kill()
+            break
+        if line is None:
+            break
+        status, _, rest = line.partition("\t")
+        name, _, message = rest.partition("\t")
+        output_path = by_name.get(name)
+        if status not in ("OK", "FAIL") or output_path is None:
+            errors.append(line)
+            continue
+        reported.add(output_path)
+        deadline = time.monotonic() + timeout_s
+        if status == "OK":
+            results[output_path] = True
+        else:
+            print(f"  ERROR: {output_path.name}: {message}")
+
+    # Files missing from the report (script died or timed out mid-batch)
+    # count as failed
+    if process.wait() != 0 and errors:
+        print(f"  ERROR: {' '.join(errors).strip()}")
+    return results
+
+
+def convert_pdf_to_word(pdf_path: Path, output_path: Path,
+                        timeout_s: float = CONVERSION_TIMEOUT_SECONDS) -> bool:
+    """
+    Convert a PDF to Word using Adobe Acrobat via external AppleScript.
+    Uses JavaScript saveAs() for synchronous saving.
+    Returns True on success, False on failure.
+    """
+    return convert_pdfs_to_word([(pdf_path, output_path)], timeout_s)[output_path]
+
+
+def find_soffice():
+    """Return the LibreOffice soffice binary, or None if not installed."""
+    return shutil.which("soffice") or (MAC_SOFFICE if os.path.exists(MAC_SOFFICE) else None)
+
+
+def is_text_pdf(pdf_path: Path) -> bool:
+    """
+    Cheap probe: True when page 1 already has a text layer (more than
+    TEXT_PDF_MIN_CHARS characters), i.e. the PDF is not a scan.
+    """
+    try:
+        text = PdfReader(pdf_path).pages[0].extract_text() or ""
+    except Exception:
+        return False
+    return len(text.strip()) > TEXT_PDF_MIN_CHARS
+
+
+def convert_pdf_with_soffice(soffice: str, pdf_path: Path, output_path: Path,
+                             slot_dir: Path) -> bool:
+    """
+    Convert a text-based PDF to Word using headless LibreOffice.
+
+    Args:
+        soffice: Path to the soffice binary
+        slot_dir: Directory private to one worker, holding its LibreOffice
+            profile (concurrent instances cannot share one) and scratch output
+
+    Returns True on success, False on failure.
+    """
+    scratch_dir = slot_dir / "out"
+    cmd = [
+        soffice, "--headless",
+        f"-env:UserInstallation={(slot_dir / 'profile').as_uri()}",
+        "--infilter=writer_pdf_import",
+        "--convert-to", "docx:MS Word 2007 XML",
+        "--outdir", str(scratch_dir),
+        str(pdf_path)
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                timeout=CONVERSION_TIMEOUT_SECONDS)
+    except (subprocess.TimeoutExpired, OSError):
+        return False
+
+    produced = scratch_dir / f"{pdf_path.stem}.docx"
+    if result.returncode != 0 or not produced.is_file():
         return False
+    # Copy next to the output and rename it into place: the scratch directory
+    # may be on another volume, where a move would write output_path directly,
+    # and a killed run must never leave a partial .docx the next run would skip
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    try:
+        shutil.copyfile(produced, tmp_path)
+        os.replace(tmp_path, output_path)
+    except OSError:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        return False
+    finally:
+        produced.unlink(missing_ok=True)
+    return True
+
 
+def convert_text_pdf(soffice: str, pdf_path: Path, output_path: Path, slots: Queue):
+    """
+    Soffice lane task. Returns None when the PDF is scanned and needs
+    Acrobat, otherwise True/False for the soffice conversion.
+    """
+    if not is_text_pdf(pdf_path):
+        return None
+    slot_dir = slots.get()
+    try:
+        return convert_pdf_with_soffice(soffice, pdf_path, output_path, slot_dir)
+    finally:
+        slots.put(slot_dir)
+
+
+def load_state(output_dir: Path) -> dict:
+    """Load _state.json: pdf name -> {status, digest, duration, size, mtime_ns}."""
+    try:
+        with open(output_dir / STATE_FILE_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-def run(input_dir: Path) -> dict:
+
+def save_state(output_dir: Path, state: dict):
+    """Write _state.json atomically (temp file + rename)."""
+    state_path = output_dir / STATE_FILE_NAME
+    tmp_path = state_path.with_name(f".{STATE_FILE_NAME}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, state_path)
+
+
+def run(input_dir: Path, on_complete: Callable[[Path], None] = None,
+        retry_policy: RetryPolicy = ACROBAT_RETRY_POLICY) -> dict:
     """
     Run Stage 1: PDF to Word conversion.
 
+    Conversions run in batches of BATCH_SIZE files per osascript call on a
+    single background worker (Acrobat is a singleton) while the main loop
+    keeps the next batch queued behind the current one.
+    Failed files are retried later with jittered exponential backoff instead of
+    blocking the files behind them. Text PDFs are converted in parallel by
+    LibreOffice when available (see convert_text_pdf).
+
     Args:
         input_dir: Path to folder containing PDF files
+        on_complete: Optional callback, called with each .docx path as soon
+            as it is written (lets run_pipeline start Stage 2 early)
+        retry_policy: Attempts, backoff and final-attempt hook for Acrobat
 
     Returns:
         dict with counts: {'converted': N, 'skipped': N, 'failed': N}
@@ -81,8 +480,13 @@ def run(input_dir: Path) -> dict:
     # Ensure output directory exists
     output_dir.mkdir(exist_ok=True)
 
-    # Get list of PDFs
-    pdf_files = sorted(input_dir.glob("*.pdf"))
+    # Get list of PDFs with their size/mtime (one directory read; hidden files
+    # such as macOS "._" AppleDouble copies are skipped)
+    with os.scandir(input_dir) as entries:
+        pdf_stats = {Path(entry.path): entry.stat() for entry in entries
+                     if entry.name.endswith(".pdf") and not entry.name.startswith(".")
+                     and entry.is_file()}
+    pdf_files = sorted(pdf_stats)
 
     if not pdf_files:
         print(f"\nNo PDF files found in {input_dir}")
@@ -90,96 +494,354 @@ def run(input_dir: Path) -> dict:
 
     print(f"\nFound {len(pdf_files)} PDF file(s) to process.\n")
 
-    success_count = 0
+    # Skip files whose output already exists (one directory read instead of a stat per file)
+    with os.scandir(output_dir) as entries:
+        existing = {entry.name for entry in entries}
+    # PDFs converted before (same content, any name) are restored from the
+    # cache. Acrobat and LibreOffice produce different .docx files, so each
+    # lane keys its entries by its own variant; LibreOffice entries are only
+    # reused while that lane is available.
+    soffice = find_soffice() if PdfReader is not None else None
+    caches = {lane: ContentCache("stage1_docx", ".docx", variant=lane)
+              for lane in ("acrobat", "soffice")}
+    restore_lanes = ("acrobat", "soffice") if soffice else ("acrobat",)
+    state = load_state(output_dir)
+    state_updates = 0
+    digests = {}  # output_path -> SHA-256 of the source PDF
+    file_seconds = {}  # output_path -> conversion time (Acrobat batch average)
+    pending = deque()
     skip_count = 0
+    changed_count = 0
+    cached_counts = dict.fromkeys(restore_lanes, 0)
+
+    def record_state(pdf_path: Path, output_path: Path, status: str):
+        """Record a finished file in _state.json (saved every STATE_SAVE_EVERY updates)."""
+        nonlocal state_updates
+        stat = pdf_stats[pdf_path]
+        state[pdf_path.name] = {
+            'status': status,
+            'digest': digests[output_path],
+            'duration': file_seconds.get(output_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        state_updates += 1
+        if state_updates % STATE_SAVE_EVERY == 0:
+            save_state(output_dir, state)
+
+    for pdf_path in pdf_files:
+        output_name = f"{pdf_path.stem}.docx"
+        output_path = output_dir / output_name
+        stat = pdf_stats[pdf_path]
+        record = state.get(pdf_path.name)
+        unchanged = (record is not None and record.get('size') == stat.st_size and
+                     record.get('mtime_ns') == stat.st_mtime_ns)
+        if output_name in existing:
+            if record is None or unchanged:
+                skip_count += 1
+                continue
+            changed_count += 1  # PDF replaced since its last conversion: reconvert
+            # Drop the stale .docx and Markdown (Stages 2 and 3 skip by output
+            # name), so a failed reconversion is retried on the next run
+            # instead of leaving the old content in place
+            for stale_path in (output_path,
+                               input_dir / "_stage2_raw_md" / f"{pdf_path.stem}.md",
+                               input_dir / "Sidecar Files" / f"{pdf_path.stem}.md"):
+                stale_path.unlink(missing_ok=True)
+        # Reuse the recorded digest when the PDF is unchanged (no re-hash)
+        digest = record['digest'] if unchanged and record.get('digest') else file_digest(pdf_path)
+        digests[output_path] = digest
+        lane = next((lane for lane in restore_lanes
+                     if caches[lane].restore(digest, output_path)), None)
+        if lane:
+            cached_counts[lane] += 1
+            record_state(pdf_path, output_path, 'converted')
+            if on_complete:
+                on_complete(output_path)
+        else:
+            pending.append((pdf_path, output_path, 1))
+
+    if skip_count:
+        print(f"Skipping {skip_count} file(s) (output already exists)")
+    if changed_count:
+        print(f"Reconverting {changed_count} file(s) (PDF changed since last conversion)")
+    cached_count = sum(cached_counts.values())
+    if cached_count:
+        lanes = f"{cached_counts['acrobat']} Acrobat"
+        if soffice:
+            lanes += f", {cached_counts['soffice']} LibreOffice"
+        print(f"Restored {cached_count} file(s) from cache (unchanged content: {lanes})")
+
+    total = len(pending)
+    success_count = cached_count
     fail_count = 0
     start_time = time.time()
-    processed_count = 0  # Track actually processed files for ETA
-    consecutive_failures = 0  # Circuit breaker for systemic issues
+    processed_count = 0  # Files finished (converted or out of retries), for ETA
+    breaker = CircuitBreaker(MAX_CONSECUTIVE_FAILURES, RECOVERY_SECONDS, MAX_RECOVERY_SECONDS)
+    probe_future = None  # The HALF_OPEN probe batch, if one is in flight
     failed_files = []  # Log of failed file names
-
-    for i, pdf_path in enumerate(pdf_files, 1):
-        output_path = output_dir / f"{pdf_path.stem}.docx"
-
-        # Calculate ETA based on processed files
-        eta_str = ""
-        if processed_count > 0:
-            elapsed = time.time() - start_time
-            avg_per_file = elapsed / processed_count
-            remaining_files = len(pdf_files) - i + 1
-            remaining_time = remaining_files * avg_per_file
-            eta_str = f" | ETA: {str(timedelta(seconds=int(remaining_time)))}"
-
-        print(f"[{i}/{len(pdf_files)}] {pdf_path.name}{eta_str}")
-
-        # Check if output already exists
-        if output_path.exists():
-            print(f"  Skipping... (output already exists)")
-            skip_count += 1
-            continue
-
-        print(f"  Converting to Word...")
-        conversion_success = False
-
-        if convert_pdf_to_word(pdf_path, output_path):
-            print(f"  Success: {output_path.name}")
-            conversion_success = True
-        else:
-            # Retry 1: wait 10 seconds
-            print(f"  Retry 1 in 10 seconds...")
-            time.sleep(10)
-            if convert_pdf_to_word(pdf_path, output_path):
-                print(f"  Success on retry 1: {output_path.name}")
-                conversion_success = True
-            else:
-                # Retry 2: wait 15 seconds
-                print(f"  Retry 2 in 15 seconds...")
-                time.sleep(15)
-                if convert_pdf_to_word(pdf_path, output_path):
-                    print(f"  Success on retry 2: {output_path.name}")
-                    conversion_success = True
-                else:
-                    # All retries failed - force-kill Acrobat and try once more
-                    print(f"  All retries failed. Force-killing Acrobat...")
-                    force_kill_acrobat()
-                    if convert_pdf_to_word(pdf_path, output_path):
-                        print(f"  Success after restart: {output_path.name}")
-                        conversion_success = True
-
-        # Track success/failure for circuit breaker
-        if conversion_success:
-            success_count += 1
-            consecutive_failures = 0  # Reset circuit breaker
-        else:
-            fail_count += 1
-            failed_files.append(pdf_path.name)
-            consecutive_failures += 1
-
-            # Circuit breaker: abort if too many consecutive failures
-            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                print(f"\n{'='*60}")
-                print(f"ABORTING: {consecutive_failures} consecutive failures detected.")
-                print("Acrobat may be stuck in a modal state (dialog, debugger, etc.)")
-                print("Close any Acrobat dialogs and re-run to resume from where you left off.")
-                print(f"{'='*60}\n")
-                break
-
+    failed_log = output_dir / "_failed_pdfs.txt"
+    failed_log_fp = None  # Opened on the first failure of this run
+    retry_queue = []  # Heap of (ready_at, seq, pdf_path, output_path, attempt)
+    retry_seq = 0
+    in_flight = {}  # Future -> batch of (pdf_path, output_path, attempt)
+    next_start = time.monotonic()  # Earliest start time for the next conversion
+    durations = deque(maxlen=ADAPTIVE_WINDOW)  # Per-file seconds of successful batches
+    logged_timeout = CONVERSION_TIMEOUT_SECONDS
+    aborted = False
+
+    def convert_paced(batch: list, probe: bool = False) -> dict:
+        """Worker task: enforce the minimum start interval, then convert a batch."""
+        nonlocal next_start
+        if probe:
+            # Recovery probe: restart Acrobat in case it is stuck in a modal state
+            force_kill_acrobat()
+        elif (retry_policy.before_final_attempt and
+              any(retry_policy.is_final(attempt) for _, _, attempt in batch)):
+            retry_policy.before_final_attempt()
+        delay = next_start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        next_start = time.monotonic() + DELAY_SECONDS
+        started = time.monotonic()
+        results = convert_pdfs_to_word([(pdf_path, output_path)
+                                        for pdf_path, output_path, _ in batch],
+                                       adaptive_timeout())
+        # osascript reports no per-file timings; use the batch average
+        per_file = (time.monotonic() - started) / len(batch)
+        for _, output_path, _ in batch:
+            file_seconds[output_path] = per_file
+        if all(results.values()):
+            durations.extend([per_file] * len(batch))
+        return results
+
+    def adaptive_timeout() -> float:
+        """Per-file timeout: 2x the recent p95 once enough samples exist, else the static value."""
+        nonlocal logged_timeout
+        if len(durations) < ADAPTIVE_MIN_SAMPLES:
+            return CONVERSION_TIMEOUT_SECONDS
+        p95 = statistics.quantiles(durations, n=20)[18]
+        timeout_s = max(MIN_TIMEOUT_SECONDS, 2 * p95)
+        # Make large departures from the static baseline visible (logged on change)
+        diverges = not (CONVERSION_TIMEOUT_SECONDS / 2 <= timeout_s <= CONVERSION_TIMEOUT_SECONDS * 2)
+        if diverges and abs(timeout_s - logged_timeout) > logged_timeout / 4:
+            print(f"  >> Adaptive timeout: {timeout_s:.0f}s per file "
+                  f"(p95 {p95:.0f}s, baseline {CONVERSION_TIMEOUT_SECONDS}s)")
+            logged_timeout = timeout_s
+        return timeout_s
+
+    def next_ready_batch(size: int = BATCH_SIZE) -> list:
+        """Pop up to `size` items to convert: due retries first, then new files."""
+        batch = []
+        now = time.monotonic()
+        while len(batch) < size and retry_queue and retry_queue[0][0] <= now:
+            _, _, pdf_path, output_path, attempt = heapq.heappop(retry_queue)
+            batch.append((pdf_path, output_path, attempt))
+        while len(batch) < size and pending:
+            batch.append(pending.popleft())
+        return batch
+
+    def seconds_until_dispatch():
+        """Time until blocked Acrobat work can start (circuit half-opens or a retry falls due)."""
+        if breaker.state == CircuitBreaker.OPEN:
+            return breaker.seconds_until_half_open()
+        if breaker.state == CircuitBreaker.HALF_OPEN and probe_future is not None:
+            # Nothing else is admitted until the probe in flight reports back
+            return None
+        if retry_queue:
+            return max(0.0, retry_queue[0][0] - time.monotonic())
+        return None
+
+    def log_failure(pdf_path: Path):
+        """Record a failed file; the manifest line is written immediately so it survives an abort or Ctrl-C."""
+        nonlocal failed_log_fp
+        failed_files.append(pdf_path.name)
+        if failed_log_fp is None:
+            failed_log_fp = open(failed_log, "w", encoding="utf-8", buffering=1)
+        failed_log_fp.write(pdf_path.name + "\n")
+
+    def report_progress(pdf_path: Path):
+        """Count a finished file and print progress with an ETA."""
+        nonlocal processed_count
         processed_count += 1
+        elapsed = time.time() - start_time
+        remaining_time = (total - processed_count) * elapsed / processed_count
+        eta_str = f" | ETA: {str(timedelta(seconds=int(remaining_time)))}"
+        print(f"[{processed_count}/{total}] {pdf_path.name}{eta_str}")
 
-        # Delay between files to prevent Acrobat from freezing
-        if i < len(pdf_files):
-            print(f"  Waiting {DELAY_SECONDS} seconds...")
-            time.sleep(DELAY_SECONDS)
+    # Text PDFs go to a separate LibreOffice pool first (bulkhead: a hung
+    # Acrobat never stalls it); scanned ones are handed back to Acrobat
+    lane_workers = SOFFICE_WORKERS if soffice and pending else 0
+    text_lane = {}  # Future -> (pdf_path, output_path)
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor, \
+                ThreadPoolExecutor(max_workers=max(1, lane_workers)) as lane_executor, \
+                tempfile.TemporaryDirectory(prefix="soffice_slots_") as slot_root:
+            if pending:
+                # Queued ahead of the first batch on the Acrobat worker, so the
+                # cold start overlaps the LibreOffice lane and stays out of the
+                # timed conversions
+                executor.submit(warm_acrobat)
+            if lane_workers:
+                print(f"Routing text PDFs to {lane_workers} LibreOffice worker(s), "
+                      f"scanned PDFs to Acrobat.\n")
+                slots = Queue()
+                for i in range(lane_workers):
+                    slots.put(Path(slot_root) / f"slot{i}")
+                while pending:
+                    pdf_path, output_path, _ = pending.popleft()
+                    future = lane_executor.submit(convert_text_pdf, soffice,
+                                                  pdf_path, output_path, slots)
+                    text_lane[future] = (pdf_path, output_path)
+
+            while (pending or retry_queue or in_flight or text_lane) and not aborted:
+                # Keep one batch queued behind the running one; while the circuit
+                # is HALF_OPEN only a single-file probe is admitted
+                while len(in_flight) < 2 and breaker.allow_request():
+                    probe = breaker.state == CircuitBreaker.HALF_OPEN
+                    batch = next_ready_batch(1 if probe else BATCH_SIZE)
+                    if not batch:
+                        break
+                    future = executor.submit(convert_paced, batch, probe)
+                    in_flight[future] = batch
+                    if probe:
+                        print(f"  >> Circuit half-open: probing Acrobat with {batch[0][0].name}")
+                        breaker.half_open_probes = 1
+                        probe_future = future
+
+                if not in_flight and not text_lane:
+                    # Only work that is waiting on a retry delay or an open circuit remains
+                    time.sleep(seconds_until_dispatch() or 0.0)
+                    continue
+
+                # Wake when either lane finishes, or when blocked Acrobat work can
+                # start while Acrobat has a free slot
+                timeout = seconds_until_dispatch() if len(in_flight) < 2 else None
+                done, _ = wait([*in_flight, *text_lane], timeout=timeout,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in text_lane:
+                        pdf_path, output_path = text_lane.pop(future)
+                        try:
+                            conversion_success = future.result()
+                        except Exception as e:
+                            print(f"  ERROR: {e}")
+                            conversion_success = False
+                        if not conversion_success:
+                            if conversion_success is False:
+                                print(f"  {pdf_path.name}: LibreOffice conversion failed, "
+                                      f"falling back to Acrobat")
+                            pending.append((pdf_path, output_path, 1))
+                            continue
+                        report_progress(pdf_path)
+                        print(f"  Success: {output_path.name} (LibreOffice)")
+                        success_count += 1
+                        caches["soffice"].store(digests[output_path], output_path, pdf_path.name)
+                        record_state(pdf_path, output_path, 'converted')
+                        if on_complete:
+                            on_complete(output_path)
+                        continue
+
+                    batch = in_flight.pop(future)
+                    is_probe = future is probe_future
+                    if is_probe:
+                        probe_future = None
+                    tripped = False
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        print(f"  ERROR: {e}")
+                        results = {}
+
+                    for pdf_path, output_path, attempt in batch:
+                        conversion_success = results.get(output_path, False)
+
+                        # The probe's outcome decides the circuit, whatever the attempt
+                        if is_probe:
+                            if conversion_success:
+                                print("  >> Probe succeeded: circuit closed, resuming.")
+                                breaker.record_success()
+                            else:
+                                tripped = breaker.record_failure(probe=True)
+
+                        if not conversion_success and not retry_policy.is_final(attempt):
+                            # Retry later with jittered exponential backoff; other files go first
+                            backoff = retry_policy.delay(attempt)
+                            print(f"  {pdf_path.name}: attempt {attempt}/{retry_policy.max_attempts} failed, "
+                                  f"retrying in {backoff:.0f}s")
+                            retry_seq += 1
+                            heapq.heappush(retry_queue, (time.monotonic() + backoff, retry_seq,
+                                                         pdf_path, output_path, attempt + 1))
+                            continue
+
+                        report_progress(pdf_path)
+
+                        # Track success/failure for circuit breaker
+                        if conversion_success:
+                            print(f"  Success: {output_path.name} (Acrobat" +
+                                  (f", attempt {attempt})" if attempt > 1 else ")"))
+                            success_count += 1
+                            if not is_probe:
+                                breaker.record_success()
+                            caches["acrobat"].store(digests[output_path], output_path, pdf_path.name)
+                            record_state(pdf_path, output_path, 'converted')
+                            if on_complete:
+                                on_complete(output_path)
+                        else:
+                            print(f"  Failed after {retry_policy.max_attempts} attempts")
+                            fail_count += 1
+                            log_failure(pdf_path)
+                            record_state(pdf_path, output_path, 'failed')
+                            if not is_probe:
+                                tripped = breaker.record_failure() or tripped
+
+                    # Circuit breaker: acted on once per batch
+                    if breaker.failed_probes >= MAX_FAILED_PROBES and not aborted:
+                        print(f"\n{'='*60}")
+                        print(f"ABORTING: Acrobat did not recover after {breaker.failed_probes} probes.")
+                        print("Acrobat may be stuck in a modal state (dialog, debugger, etc.)")
+                        print("Close any Acrobat dialogs and re-run to resume from where you left off.")
+                        print(f"{'='*60}\n")
+                        aborted = True
+                    elif tripped and breaker.state == CircuitBreaker.OPEN:
+                        print(f"\n{'='*60}")
+                        print(f"CIRCUIT OPEN: {breaker.failures} consecutive failures detected."
+                              if not is_probe else "CIRCUIT OPEN: recovery probe failed.")
+                        print("Acrobat may be stuck in a modal state (dialog, debugger, etc.)")
+                        print(f"Pausing Acrobat for {breaker.recovery_s:.0f}s, then probing with one file.")
+                        print(f"{'='*60}\n")
+                        # Hand back the queued batch; it runs after the circuit closes
+                        for queued in list(in_flight):
+                            if queued.cancel():
+                                pending.extendleft(reversed(in_flight.pop(queued)))
+
+            if aborted:
+                # Drop queued work; files already mid-retry are logged as failed
+                for future in [*in_flight, *text_lane]:
+                    future.cancel()
+                for _, _, pdf_path, _, _ in retry_queue:
+                    fail_count += 1
+                    log_failure(pdf_path)
+                for pdf_path, _, attempt in [*pending, *(item for batch in in_flight.values()
+                                                          for item in batch)]:
+                    if attempt > 1:
+                        fail_count += 1
+                        log_failure(pdf_path)
+    finally:
+        if failed_log_fp is not None:
+            failed_log_fp.close()
+
+    for cache in caches.values():
+        cache.save()
+    if state_updates:
+        save_state(output_dir, state)
 
     # Summary
     print("\n" + "-" * 40)
     print(f"Stage 1 Complete: {success_count} converted, {skip_count} skipped, {fail_count} failed")
 
-    # Log failed files to manifest
     if failed_files:
-        failed_log = output_dir / "_failed_pdfs.txt"
-        with open(failed_log, "w", encoding="utf-8") as f:
-            f.write("\n".join(failed_files))
         print(f"Failed files logged to: {failed_log}")
 
     return {'converted': success_count, 'skipped': skip_count, 'failed': fail_count}
@@ -199,7 +861,7 @@ def main():
 
     if not args.input.is_dir():
         print(f"Error: {args.input} is not a valid directory")
-        return
+        sys.exit(1)
 
     run(args.input)
 
@@ -3,7 +3,8 @@
 Pipeline Router: Runs all conversion stages in sequence.
 
 Supports parallel processing for Stages 2 and 3, and sleep prevention
-via macOS caffeinate.
+via macOS caffeinate. When Stages 1 and 2 both run, they are pipelined:
+each Word file is converted to Markdown as soon as Acrobat writes it.
 
 Usage:
     python3 run_pipeline.py --input /path/to/pdf/folder
@@ -13,8 +14,12 @@ Usage:
 
 import argparse
 import os
+import queue
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from multiprocessing import cpu_count
 from pathlib import Path
 
@@ -25,6 +30,7 @@ sys.path.insert(0, str(SCRIPT_DIR))
 import pdf_to_word
 import word_to_md
 import clean_md
+from content_cache import file_digest
 
 
 def print_banner(text: str):
@@ -66,7 +72,106 @@ def stop_caffeinate(proc):
             pass
 
 
+def default_workers() -> int:
+    """
+    Default worker count for Stages 2 and 3: PIPELINE_WORKERS if set, else
+    2x CPU cores capped at 16. Pandoc calls are I/O-bound (process startup
+    and disk), so oversubscribing the cores keeps throughput up until the
+    disk saturates. Stage 1 always uses a single Acrobat worker.
+    """
+    env_workers = os.environ.get("PIPELINE_WORKERS")
+    if env_workers:
+        try:
+            return max(1, int(env_workers))
+        except ValueError:
+            print(f"Warning: ignoring invalid PIPELINE_WORKERS={env_workers!r}")
+    return min(2 * cpu_count(), 16)
+
+
+def run_stages_1_and_2(input_dir: Path, workers: int) -> tuple:
+    """
+    Run Stage 1 with Stage 2 pipelined behind it.
+
+    Stage 1 pushes each finished .docx onto a queue; a consumer thread
+    submits it to a pool of Pandoc worker threads (each only waits on the
+    shared pandoc server or a pandoc subprocess) while Acrobat moves on to
+    the next PDF. A regular Stage 2 run afterwards picks up anything not
+    handled here (older .docx files, pipelined failures) through the same
+    server.
+
+    Returns:
+        (stage1_results, stage2_results) count dicts
+    """
+    if word_to_md.find_pandoc() is None:
+        # Nothing to pipeline; Stage 2 reports the missing Pandoc once
+        return pdf_to_word.run(input_dir), word_to_md.run(input_dir, workers=workers)
+
+    output_dir = input_dir / "_stage2_raw_md"
+    output_dir.mkdir(exist_ok=True)
+    docx_queue = queue.Queue()
+    cache = word_to_md.stage2_cache()
+    pipelined = {'converted': 0, 'failed': 0}
+    word_to_md.get_server()  # Stopped by main() once the pipeline is done
+
+    # Snapshot existing outputs once; only this consumer adds to the folder
+    # while Stage 1 runs, and each .docx is queued once. Stage 1 may delete
+    # the stale .md of a changed PDF, so a snapshot hit is re-checked.
+    with os.scandir(output_dir) as entries:
+        existing = {entry.name for entry in entries}
+
+    lock = threading.Lock()  # Guards pipelined counts and the cache manifest
+
+    def report(future, docx_path: Path, output_path: Path, digest: str):
+        """Done-callback: report a conversion as soon as it finishes."""
+        success = future.exception() is None and future.result()
+        with lock:
+            if success:
+                print(f"  [Stage 2] ✓ {docx_path.name}")
+                pipelined['converted'] += 1
+                cache.store(digest, output_path, docx_path.name)
+            else:
+                print(f"  [Stage 2] ✗ {docx_path.name} (retried below)")
+                pipelined['failed'] += 1
+
+    def consume(executor):
+        """Submit queued .docx files until the None sentinel."""
+        while (docx_path := docx_queue.get()) is not None:
+            output_path = output_dir / f"{docx_path.stem}.md"
+            if output_path.name in existing and output_path.exists():
+                continue
+            digest = file_digest(docx_path)
+            if cache.restore(digest, output_path):
+                with lock:
+                    pipelined['converted'] += 1
+                continue
+            future = executor.submit(word_to_md.convert_with_server, docx_path, output_path)
+            future.add_done_callback(partial(report, docx_path=docx_path,
+                                             output_path=output_path, digest=digest))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        consumer = threading.Thread(target=consume, args=(executor,))
+        consumer.start()
+        try:
+            stage1 = pdf_to_word.run(input_dir, on_complete=docx_queue.put)
+        finally:
+            docx_queue.put(None)  # Sentinel: Stage 1 is done
+            consumer.join()
+    cache.save()  # Every conversion (and its callback) has finished here
+
+    # Catch-up pass: everything converted above is skipped here
+    stage2 = word_to_md.run(input_dir, workers=workers)
+    stage2 = {
+        'converted': pipelined['converted'] + stage2['converted'],
+        'skipped': stage2['skipped'] - pipelined['converted'],
+        'failed': stage2['failed'],
+    }
+    return stage1, stage2
+
+
 def main():
+    # Computed once: an invalid PIPELINE_WORKERS warns a single time
+    fallback_workers = default_workers()
+
     parser = argparse.ArgumentParser(
         description="PDF-to-Markdown Pipeline Router",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -100,7 +205,8 @@ Examples:
         "-w", "--workers",
         type=int,
         default=None,
-        help=f"Number of parallel workers for Stages 2 and 3 (default: {max(1, cpu_count() - 1)})"
+        help=f"Number of parallel workers for Stages 2 and 3 "
+             f"(default: $PIPELINE_WORKERS or 2x CPU cores, max 16: {fallback_workers})"
     )
     parser.add_argument(
         "--no-caffeinate",
@@ -121,7 +227,7 @@ Examples:
     stages_to_run = sorted(set(stages_to_run))  # Remove duplicates, sort
 
     # Determine worker count
-    workers = args.workers if args.workers else max(1, cpu_count() - 1)
+    workers = args.workers if args.workers else fallback_workers
 
     # Start caffeinate to prevent sleep
     caffeinate_proc = None
@@ -142,10 +248,11 @@ Examples:
         results = {}
 
         # Run selected stages
-        if 1 in stages_to_run:
+        if 1 in stages_to_run and 2 in stages_to_run:
+            results[1], results[2] = run_stages_1_and_2(input_dir, workers)
+        elif 1 in stages_to_run:
             results[1] = pdf_to_word.run(input_dir)
-
-        if 2 in stages_to_run:
+        elif 2 in stages_to_run:
             results[2] = word_to_md.run(input_dir, workers=workers)
 
         if 3 in stages_to_run:
@@ -167,7 +274,8 @@ Examples:
         print(f"\nTotal: {total_converted} converted, {total_skipped} skipped, {total_failed} failed")
 
     finally:
-        # Always stop caffeinate when done
+        # Always stop the shared pandoc server and caffeinate when done
+        word_to_md.shutdown_server()
         stop_caffeinate(caffeinate_proc)
 
 
@@ -4,7 +4,10 @@ Stage 2: The Converter
 Converts Word (.docx) files to Markdown using Pandoc.
 CRITICAL: Uses --wrap=none to preserve tables for NotebookLM.
 
-Supports parallel processing for large batches.
+Supports parallel processing for large batches: Pandoc runs as asyncio
+subprocesses from a single Python process, capped by a semaphore. When
+available, one persistent `pandoc server` handles all conversions over HTTP
+(no process startup per file), with per-file subprocesses as the fallback.
 
 Usage:
     python3 word_to_md.py --input /path/to/pdf/folder
@@ -12,18 +15,50 @@ Usage:
 """
 
 import argparse
+import asyncio
+import base64
+import json
+import os
+import shutil
+import socket
 import subprocess
-from multiprocessing import Pool, cpu_count
+import sys
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from multiprocessing import cpu_count
 from pathlib import Path
 
+from content_cache import ContentCache, file_digest
 
-def convert_word_to_markdown(docx_path: Path, output_path: Path) -> bool:
-    """
-    Convert a Word document to Markdown using Pandoc.
-    Returns True on success, False on failure.
-    """
-    cmd = [
-        "pandoc",
+# Seconds before a single Pandoc conversion is abandoned
+PANDOC_TIMEOUT_SECONDS = 60
+
+# Commands that start Pandoc's HTTP server (pandoc >= 3 has the subcommand;
+# older installs ship a separate pandoc-server binary), and how long to wait
+# for it to accept connections
+PANDOC_SERVER_COMMANDS = (["pandoc", "server"], ["pandoc-server"])
+PANDOC_SERVER_START_SECONDS = 5
+
+# Documents posted per request to the server's /batch endpoint (smaller when
+# there are too few files to keep every worker busy). A request gets the
+# single-conversion timeout, so a batch must finish well within it; a batch
+# that fails as a whole is retried one document per request.
+PANDOC_BATCH_SIZE = 20
+
+
+@lru_cache(maxsize=None)
+def find_pandoc():
+    """Return the pandoc binary (resolved once per process), or None if not installed."""
+    return shutil.which("pandoc")
+
+
+def pandoc_command(docx_path: Path, output_path: Path) -> list:
+    """Build the Pandoc command line for one Word → Markdown conversion."""
+    return [
+        find_pandoc() or "pandoc",
         str(docx_path),
         "-f", "docx",
         "-t", "markdown",
@@ -31,49 +66,289 @@ def convert_word_to_markdown(docx_path: Path, output_path: Path) -> bool:
         "--wrap=none"  # CRITICAL: Preserves tables for NotebookLM
     ]
 
+
+@lru_cache(maxsize=None)
+def pandoc_fingerprint() -> str:
+    """
+    Pandoc version line plus the conversion options, used as the Stage 2
+    cache variant so outputs from another Pandoc release are not reused.
+    """
+    version = ""
+    if find_pandoc() is not None:
+        try:
+            result = subprocess.run([find_pandoc(), "--version"], capture_output=True,
+                                    text=True, timeout=10)
+            version = result.stdout.partition("\n")[0]
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    command = pandoc_command(Path("input.docx"), Path("output.md"))
+    options = [arg for arg in command[2:] if arg not in ("-o", "output.md")]
+    return " ".join([version, *options])
+
+
+def stage2_cache() -> ContentCache:
+    """Open the Stage 2 output cache for the installed Pandoc."""
+    return ContentCache("stage2_md", ".md", variant=pandoc_fingerprint())
+
+
+def temp_output_path(output_path: Path) -> Path:
+    """Hidden sibling that a conversion writes before it is renamed to output_path."""
+    return output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+
+
+def finish_output(tmp_path: Path, output_path: Path, success: bool) -> bool:
+    """
+    Rename a finished temp output into place (atomic), or delete it after a
+    failure, so an interrupted conversion never leaves a truncated output
+    that later runs would skip as done. Returns True if the output is in place.
+    """
+    if success:
+        try:
+            os.replace(tmp_path, output_path)
+            return True
+        except OSError:
+            pass
+    try:
+        tmp_path.unlink(missing_ok=True)
+    except OSError:
+        pass
+    return False
+
+
+def convert_word_to_markdown(docx_path: Path, output_path: Path) -> bool:
+    """
+    Convert a Word document to Markdown using Pandoc.
+    Returns True on success, False on failure.
+    """
+    tmp_path = temp_output_path(output_path)
     try:
         result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
+            pandoc_command(docx_path, tmp_path),
+            stdout=subprocess.DEVNULL,  # Output goes to the -o file
+            stderr=subprocess.DEVNULL,  # Never inspected: failure is the exit status
+            close_fds=False,  # With an absolute path, lets CPython use posix_spawn (no fork)
+            timeout=PANDOC_TIMEOUT_SECONDS
         )
-        if result.returncode != 0:
-            return False
-        return True
-    except subprocess.TimeoutExpired:
-        return False
-    except FileNotFoundError:
+        success = result.returncode == 0
+    except Exception:  # Timeout, pandoc not installed, ...
+        success = False
+    return finish_output(tmp_path, output_path, success)
+
+
+async def convert_word_to_markdown_async(docx_path: Path, output_path: Path) -> bool:
+    """
+    Asyncio variant of convert_word_to_markdown (same Pandoc command).
+    Returns True on success, False on failure.
+    """
+    tmp_path = temp_output_path(output_path)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *pandoc_command(docx_path, tmp_path),
+            stdout=asyncio.subprocess.DEVNULL,  # Output goes to the -o file
+            stderr=asyncio.subprocess.DEVNULL,  # Never inspected: failure is the exit status
+            close_fds=False  # See convert_word_to_markdown
+        )
+    except OSError:
         return False
-    except Exception:
+
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=PANDOC_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return finish_output(tmp_path, output_path, False)
+    return finish_output(tmp_path, output_path, proc.returncode == 0)
+
+
+class PandocServer:
+    """
+    A persistent `pandoc server` subprocess on a local port.
+
+    One Haskell runtime converts every document, so the per-file process
+    startup of the CLI is paid once. Documents are posted as base64 JSON
+    with the same options as pandoc_command(), many per /batch request.
+    """
+
+    def __init__(self):
+        self.proc = None
+        self.url = None
+
+    def start(self) -> bool:
+        """Start the server and wait until it accepts connections. Returns False if unavailable."""
+        for program, *args in PANDOC_SERVER_COMMANDS:
+            executable = shutil.which(program)
+            if executable is None:
+                continue
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+            try:
+                self.proc = subprocess.Popen(
+                    # The server timeout applies per request (see convert_batch)
+                    [executable, *args, "--port", str(port),
+                     "--timeout", str(PANDOC_TIMEOUT_SECONDS)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except OSError:
+                continue
+
+            deadline = time.monotonic() + PANDOC_SERVER_START_SECONDS
+            while time.monotonic() < deadline and self.proc.poll() is None:
+                try:
+                    with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                        self.url = f"http://127.0.0.1:{port}/"
+                        return True
+                except OSError:
+                    time.sleep(0.05)
+            self.stop()  # Exited (no server support) or never came up
         return False
 
+    def convert_batch(self, pairs: list) -> list:
+        """
+        Convert (docx_path, output_path) pairs in one /batch request.
+        Returns a success flag per pair.
+
+        If the request fails as a whole (e.g. one document hangs until the
+        timeout), each document is sent again on its own, so only the bad
+        one fails instead of the whole batch.
+        """
+        results = self._post_batch(pairs)
+        if results is None and len(pairs) > 1:
+            results = [(self._post_batch([pair]) or [False])[0] for pair in pairs]
+        return results or [False] * len(pairs)
+
+    def _post_batch(self, pairs: list) -> list:
+        """Post pairs to /batch. Returns a success flag per pair, or None if the request fails."""
+        try:
+            payload = json.dumps([{
+                "text": base64.b64encode(docx_path.read_bytes()).decode("ascii"),
+                "from": "docx",
+                "to": "markdown",
+                "wrap": "none",  # CRITICAL: Preserves tables for NotebookLM
+            } for docx_path, _ in pairs]).encode("utf-8")
+            request = urllib.request.Request(
+                self.url + "batch",
+                data=payload,
+                headers={"Content-Type": "application/json", "Accept": "application/json"}
+            )
+            # A little over the server's own timeout, which should answer first
+            with urllib.request.urlopen(request, timeout=PANDOC_TIMEOUT_SECONDS + 5) as response:
+                results = json.load(response)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(results, list) or len(results) != len(pairs):
+            return None
+        return [self._write_output(result, output_path)
+                for result, (_, output_path) in zip(results, pairs)]
+
+    @staticmethod
+    def _write_output(result, output_path: Path) -> bool:
+        """Write one conversion result (an error is returned as a string). Returns True on success."""
+        try:
+            output = result["output"]
+            if result.get("base64"):
+                output = base64.b64decode(output).decode("utf-8")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
 
-def _convert_single_file(args: tuple) -> tuple:
+        # The CLI ends its output with a newline; match it
+        if output and not output.endswith("\n"):
+            output += "\n"
+        tmp_path = temp_output_path(output_path)
+        try:
+            tmp_path.write_text(output, encoding="utf-8")
+        except OSError:
+            return finish_output(tmp_path, output_path, False)
+        return finish_output(tmp_path, output_path, True)
+
+    def stop(self):
+        """Terminate the server process if it is running."""
+        if self.proc is not None:
+            try:
+                self.proc.terminate()
+                self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+            self.proc = None
+        self.url = None
+
+
+# Shared server for the process (see get_server)
+_server = None
+
+
+def get_server() -> PandocServer:
     """
-    Worker function for parallel processing.
-    Args: (docx_path, output_path) tuple
-    Returns: (status, filename) tuple where status is 'success', 'skipped', or 'failed'
+    Return the shared pandoc server, starting it on first use.
+
+    The pipeline driver calls this once so pipelined and catch-up Stage 2
+    conversions share one server, and calls shutdown_server() at the end.
+    If no server could be started the returned object has url None.
     """
-    docx_path, output_path = args
+    global _server
+    if _server is None:
+        _server = PandocServer()
+        if _server.start():
+            print("Using persistent pandoc server.\n")
+    return _server
 
-    # Skip if output already exists
-    if output_path.exists():
-        return ('skipped', docx_path.name)
 
-    # Convert
-    if convert_word_to_markdown(docx_path, output_path):
-        return ('success', docx_path.name)
-    return ('failed', docx_path.name)
+def shutdown_server():
+    """Stop the shared pandoc server, if one was started."""
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
+
+
+def convert_with_server(docx_path: Path, output_path: Path) -> bool:
+    """
+    Convert one document through the shared server when it is running,
+    falling back to a Pandoc subprocess. Returns True on success.
+    """
+    server = _server
+    if server is not None and server.url and server.convert_batch([(docx_path, output_path)])[0]:
+        return True
+    return convert_word_to_markdown(docx_path, output_path)
+
+
+def link_or_copy(src: Path, dst: Path) -> bool:
+    """Hard-link src to dst (falling back to a copy). Returns True on success."""
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        pass
+    tmp_path = temp_output_path(dst)
+    try:
+        shutil.copyfile(src, tmp_path)
+    except OSError:
+        return finish_output(tmp_path, dst, False)
+    return finish_output(tmp_path, dst, True)
 
 
 def run(input_dir: Path, workers: int = None) -> dict:
+    """
+    Run Stage 2: Word to Markdown conversion (sync wrapper around run_async).
+
+    Args:
+        input_dir: Path to folder containing PDF files (reads from _stage1_docx subfolder)
+        workers: Number of concurrent Pandoc processes (default: 2x CPU cores, max 16)
+
+    Returns:
+        dict with counts: {'converted': N, 'skipped': N, 'failed': N}
+    """
+    return asyncio.run(run_async(input_dir, workers))
+
+
+async def run_async(input_dir: Path, workers: int = None) -> dict:
     """
     Run Stage 2: Word to Markdown conversion.
 
     Args:
         input_dir: Path to folder containing PDF files (reads from _stage1_docx subfolder)
-        workers: Number of parallel workers (default: CPU cores - 1)
+        workers: Number of concurrent Pandoc processes (default: 2x CPU cores, max 16)
 
     Returns:
         dict with counts: {'converted': N, 'skipped': N, 'failed': N}
@@ -96,7 +371,12 @@ def run(input_dir: Path, workers: int = None) -> dict:
         print("Run Stage 1 first.")
         return {'converted': 0, 'skipped': 0, 'failed': 0}
 
-    docx_files = sorted(docx_dir.glob("*.docx"))
+    # One directory read (file type comes from the entry, no stat per file);
+    # hidden files such as macOS "._" AppleDouble copies are skipped
+    with os.scandir(docx_dir) as entries:
+        docx_files = sorted(Path(entry.path) for entry in entries
+                            if entry.name.endswith(".docx") and not entry.name.startswith(".")
+                            and entry.is_file())
 
     if not docx_files:
         print(f"\nNo Word files found in {docx_dir}")
@@ -104,7 +384,7 @@ def run(input_dir: Path, workers: int = None) -> dict:
 
     # Determine worker count
     if workers is None:
-        workers = max(1, cpu_count() - 1)
+        workers = min(2 * cpu_count(), 16)  # Pandoc is I/O-bound: oversubscribe
 
     print(f"\nFound {len(docx_files)} Word file(s) to process.")
     print(f"Using {workers} parallel worker(s).\n")
@@ -115,40 +395,164 @@ def run(input_dir: Path, workers: int = None) -> dict:
         for docx_path in docx_files
     ]
 
+    # Snapshot existing outputs once (one directory read instead of a stat per file)
+    with os.scandir(output_dir) as entries:
+        existing = {entry.name for entry in entries}
+
+    # Documents converted before (same content, any name) are restored from the cache
+    cache = stage2_cache()
+
+    # Check for Pandoc once: without it only cache restores can succeed, and
+    # nothing is spawned per file just to fail
+    needs_conversion = any(output_path.name not in existing for _, output_path in work_items)
+    pandoc_missing = needs_conversion and find_pandoc() is None
+    if pandoc_missing:
+        print("Error: pandoc not found on PATH (install with `brew install pandoc`); "
+              "only previously cached documents can be restored.\n")
+
+    # One persistent Pandoc server when available (the caller's, if it
+    # already started one); files it cannot convert (or every file, without
+    # a server) use a Pandoc subprocess
+    owns_server = _server is None
+    if needs_conversion and not pandoc_missing:
+        server = get_server()
+    else:
+        server = PandocServer()  # Never started: url is None
+
+    # Blocking server requests get one thread per worker; asyncio's default
+    # executor (min(32, cores + 4) threads) would cap them below `workers`
+    request_pool = ThreadPoolExecutor(max_workers=workers)
+    loop = asyncio.get_running_loop()
+
+    async def convert_pairs(pairs: list) -> list:
+        """Convert (docx_path, output_path) pairs; returns a success flag per pair."""
+        if pandoc_missing:
+            return [False] * len(pairs)
+        if server.url:
+            results = await loop.run_in_executor(request_pool, server.convert_batch, pairs)
+        else:
+            results = [False] * len(pairs)
+        for i, (docx_path, output_path) in enumerate(pairs):
+            if not results[i]:
+                results[i] = await convert_word_to_markdown_async(docx_path, output_path)
+        return results
+
+    batch_size = PANDOC_BATCH_SIZE if server.url else 1
+    try:
+        return await _process_files(work_items, existing, cache, workers,
+                                    convert_pairs, batch_size)
+    finally:
+        request_pool.shutdown()
+        if owns_server:
+            shutdown_server()
+
+
+async def _process_files(work_items: list, existing: set, cache: ContentCache,
+                         workers: int, convert_pairs, batch_size: int = 1) -> dict:
+    """
+    Convert work_items (skipping existing outputs) and return the Stage 2 counts.
+
+    convert_pairs takes a list of (docx_path, output_path) and returns a
+    success flag per pair; in parallel mode it is called with up to
+    batch_size documents at a time.
+    """
     # Process files
     if workers == 1:
         # Sequential processing (preserves detailed output)
         results = []
         for i, (docx_path, output_path) in enumerate(work_items, 1):
             print(f"[{i}/{len(work_items)}] {docx_path.name}")
-            if output_path.exists():
+            if output_path.name in existing:
                 print(f"  Skipping... (output already exists)")
                 results.append(('skipped', docx_path.name))
+                continue
+            digest = file_digest(docx_path)
+            if cache.restore(digest, output_path):
+                print(f"  Restored from cache: {output_path.name}")
+                results.append(('success', docx_path.name))
             else:
                 print(f"  Converting to Markdown...")
-                if convert_word_to_markdown(docx_path, output_path):
+                if (await convert_pairs([(docx_path, output_path)]))[0]:
                     print(f"  Success: {output_path.name}")
                     results.append(('success', docx_path.name))
+                    cache.store(digest, output_path, docx_path.name)
                 else:
                     print(f"  Failed: {docx_path.name}")
                     results.append(('failed', docx_path.name))
     else:
-        # Parallel processing
+        # Parallel processing: only files without output are dispatched,
+        # and results are reported as each conversion finishes
         print("Processing files in parallel...")
-        with Pool(workers) as pool:
-            results = pool.map(_convert_single_file, work_items)
-
-        # Print summary of results
-        for status, filename in results:
-            if status == 'success':
-                print(f"  ✓ {filename}")
-            elif status == 'failed':
-                print(f"  ✗ {filename}")
-
-    # Count results
-    success_count = sum(1 for r in results if r[0] == 'success')
-    skip_count = sum(1 for r in results if r[0] == 'skipped')
-    fail_count = sum(1 for r in results if r[0] == 'failed')
+        results = []
+        # Byte-identical documents are converted once: digest -> [(docx_path, output_path)],
+        # the first entry is converted and the rest are linked to its output
+        tasks = defaultdict(list)
+        for docx_path, output_path in work_items:
+            if output_path.name in existing:
+                results.append(('skipped', docx_path.name))
+                continue
+            digest = file_digest(docx_path)
+            if cache.restore(digest, output_path):
+                print(f"  ✓ {docx_path.name} (cached)")
+                results.append(('success', docx_path.name))
+            else:
+                tasks[digest].append((docx_path, output_path))
+
+        def finish(digest: str, group: list, success: bool):
+            (docx_path, output_path), *duplicates = group
+            if not success:
+                for failed_path, _ in group:
+                    print(f"  ✗ {failed_path.name}")
+                    results.append(('failed', failed_path.name))
+                return
+            print(f"  ✓ {docx_path.name}")
+            results.append(('success', docx_path.name))
+            cache.store(digest, output_path, docx_path.name)
+            for duplicate_path, duplicate_output in duplicates:
+                if link_or_copy(output_path, duplicate_output):
+                    print(f"  ✓ {duplicate_path.name} (same content as {docx_path.name})")
+                    results.append(('success', duplicate_path.name))
+                else:
+                    print(f"  ✗ {duplicate_path.name}")
+                    results.append(('failed', duplicate_path.name))
+
+        async def convert_next(pending):
+            """Worker: convert batches from the shared iterator until it is exhausted."""
+            for chunk in pending:
+                try:
+                    successes = await convert_pairs([group[0] for _, group in chunk])
+                except Exception as error:
+                    for _, group in chunk:
+                        for docx_path, _ in group:
+                            print(f"  ✗ {docx_path.name} ({error})")
+                            results.append(('failed', docx_path.name))
+                    continue
+                for (digest, group), success in zip(chunk, successes):
+                    finish(digest, group, success)
+
+        # Largest documents first (longest-processing-time scheduling), so a
+        # big file does not start last and leave one worker running alone.
+        # Batches are no larger than needed to give every worker a share and
+        # are dealt round-robin, so no batch holds all the big files.
+        groups = sorted(tasks.items(), key=lambda item: item[1][0][0].stat().st_size,
+                        reverse=True)
+        size = max(1, min(batch_size, -(-len(groups) // workers)))
+        count = -(-len(groups) // size)
+        chunks = [groups[i::count] for i in range(count)]
+
+        # One Python process; a fixed set of worker coroutines caps concurrent
+        # Pandoc processes (or batch requests to the server) and keeps the
+        # number of live tasks at `workers` however many files there are
+        pending = iter(chunks)
+        await asyncio.gather(*(convert_next(pending) for _ in range(min(workers, count))))
+
+    cache.save()
+
+    # Count results (one pass)
+    counts = Counter(status for status, _ in results)
+    success_count = counts['success']
+    skip_count = counts['skipped']
+    fail_count = counts['failed']
 
     # Summary
     print("\n" + "-" * 40)
@@ -171,13 +575,14 @@ def main():
         "-w", "--workers",
         type=int,
         default=None,
-        help=f"Number of parallel workers (default: {max(1, cpu_count() - 1)})"
+        help=f"Number of parallel workers; 1 converts sequentially with per-file detail "
+             f"(default: {min(2 * cpu_count(), 16)})"
     )
     args = parser.parse_args()
 
     if not args.input.is_dir():
         print(f"Error: {args.input} is not a valid directory")
-        return
+        sys.exit(1)
 
     run(args.input, workers=args.workers)
 